@@ -10,72 +10,169 @@ Główne zmiany:
 
 import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
-from bs4 import BeautifulSoup
+import string
+import threading
+import time
+from bs4 import BeautifulSoup, SoupStrainer
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                              QTextEdit, QProgressBar, QGroupBox, QTabWidget,
-                             QTableWidget, QTableWidgetItem, QHeaderView,
+                             QTableView, QHeaderView,
                              QMessageBox, QCheckBox)
-from PyQt6.QtCore import QThread, pyqtSignal, Qt
+from PyQt6.QtCore import QThread, pyqtSignal, Qt, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QFont
 import json
+from functools import lru_cache
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
+try:
+    import lxml  # noqa: F401 - parser w C, znacznie szybszy od html.parser
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+try:
+    import orjson  # szybsze (de)serializowanie JSON zapytań do TVHeadend
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+# Budujemy drzewo tylko z potrzebnych fragmentów strony (tabele kanałów / linki podstron)
+_TABLES_ONLY = SoupStrainer('table')
+_LINKS_ONLY = SoupStrainer('a', href=True)
+
+# Wzorce wyrażeń regularnych kompilowane raz przy imporcie modułu
+_RE_GENRES = re.compile(r'\b(muzyczny|informacyjny|uniwersalny|filmowy|sportowy|religijny|dokumentalny|rozrywkowy|dla dzieci|telezakupowy|prawniczy|kulinarny|motoryzacyjny|erotyczny|turystyczny|lifestyle|dla młodzieży)\b', re.IGNORECASE)
+_RE_DVB_PARAMS = re.compile(r'\s*(dvb-[st]\d?(?:/\w+)?|db-s\d?/\w+)\s*', re.IGNORECASE)
+_RE_QUALITY_WORD = re.compile(r'\s*\b(HD|SD|UHD|4K|UD)\b\s*', re.IGNORECASE)
+_RE_FREQ = re.compile(r'(\d{1,2}[.,]\d{3})')
+_RE_POL = re.compile(r'\b([VHLR])\b')
+_RE_SR = re.compile(r'\b(\d{5})\b')
+_RE_FEC = re.compile(r'(\d/\d)')
+_RE_S_MOD = re.compile(r'\bs\d/\w+\b', re.IGNORECASE)
+# Końcówka nazwy: opcjonalny znak -/+ i do trzech ' D' (to samo co kolejno ' D D', ' D', '-')
+_RE_TAIL = re.compile(r'(?:\s*[-+])?(?:\s+D){0,3}\s*$')
+_RE_DIGIT = re.compile(r'\d')
+_RE_WS = re.compile(r'\s+')
+_RE_LEADING_NUM = re.compile(r'^\d+\.?\s*')
+_RE_JUNK_ROW = re.compile(r'^[\s\-_=]+$')
+# Bajty ASCII spoza klucza mapowania (wszystko oprócz liter i cyfr) - do bytes.translate
+_NON_KEY_BYTES = bytes(c for c in range(128) if chr(c) not in string.ascii_lowercase + string.digits)
+_RE_PAGE_SUFFIX = re.compile(r'-\d+$')
+
+# Słowa kluczowe wiersza nagłówka tabeli (>= 2 trafienia) i frazy nagłówków pomijanych jako kanały
+_HEADER_KEYWORDS = ('nazwa', 'name', 'częstotliwość', 'freq', 'transponder', 'tp', 'pol', 'sr', 'dostawca', 'nr', 'rozdzielczość', 'parametry')
+_HEADER_PHRASES = ('nr nazwa', 'rozdzielczość parametry', 'parametry techniczne')
+
+
+def _freq_to_mhz(freq_str):
+    """Konwertuje string częstotliwości (np. '11,508' lub '11642') na MHz (int)"""
+    if not freq_str:
+        return 0
+    
+    try:
+        val = float(freq_str.replace(',', '.'))
+    except ValueError:
+        return 0
+    # Jeśli wartość jest poniżej 1000, to pewnie GHz (np. 11.508), zamień na MHz
+    if val < 1000:
+        return int(val * 1000)
+    return int(val)
+
 
 
 class TVHeadendAPI:
     """Klasa do komunikacji z TVHeadend API (dodano obsługę multipleksów dla częstotliwości)"""
     
+    # Maksymalna liczba równoległych zapytań do serwera
+    max_workers = 8
+    
+    # Pola usług, z których korzysta GUI i ImportWorker
+    service_fields = ('uuid', 'svcname', 'svctype', 'multiplex_uuid')
+    # Pola kanałów, z których korzysta ImportWorker
+    channel_fields = ('uuid', 'services', 'tags')
+    
     def __init__(self, host, port, username="", password=""):
         self.base_url = f"http://{host}:{port}"
         self.auth = (username, password) if username else None
+        # Jedna sesja HTTP (keep-alive) dla wszystkich zapytań do serwera
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        # Pula mieści równoległe pobieranie stron (prefetch) i zapisy; chwilowe 502/503/504 ponawiamy
+        # tylko dla GET - ponowienie POST channel/create mogłoby utworzyć kanał dwa razy
+        retries = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                        allowed_methods=frozenset(['GET']))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=retries)
+        self.session.mount('http://', adapter)
+    
+    def close(self):
+        """Zamyka pulę połączeń sesji"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        
+    def get_grid(self, path, fields=None, limit=500):
+        """Pobiera wszystkie wpisy siatki API stronami po 'limit' (opcjonalnie tylko wybrane pola)"""
+        url = f"{self.base_url}{path}"
         
+        def fetch_page(start):
+            params = {'start': start, 'limit': limit}
+            response = self.session.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            data = json_loads(response.content)
+            entries = data.get('entries', [])
+            if fields:
+                # Zostawiamy tylko pola używane przez aplikację, surowa strona jest od razu zwalniana
+                entries = [
+                    {field: entry[field] for field in fields if field in entry}
+                    for entry in entries
+                ]
+            return entries, data.get('total', 0)
+        
+        # Pierwsza strona podaje 'total' - pozostałe strony pobieramy równolegle
+        all_entries, total = fetch_page(0)
+        
+        offsets = range(limit, total, limit) if all_entries else []
+        if offsets:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for entries, _ in executor.map(fetch_page, offsets):
+                    all_entries.extend(entries)
+        
+        return all_entries
+    
     def get_services(self):
         """Pobiera WSZYSTKIE usługi (kanały) z TVHeadend"""
         try:
-            all_services = []
-            start = 0
-            limit = 500
-            url = f"{self.base_url}/api/mpegts/service/grid"
-            
-            while True:
-                params = {'start': start, 'limit': limit}
-                response = requests.get(url, params=params, auth=self.auth, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                entries = data.get('entries', [])
-                total = data.get('total', 0)
-                
-                all_services.extend(entries)
-                
-                if len(all_services) >= total or len(entries) == 0:
-                    break
-                
-                start += limit
-            
-            return all_services
+            return self.get_grid('/api/mpegts/service/grid', self.service_fields)
         except Exception as e:
             raise Exception(f"Błąd pobierania usług: {str(e)}")
     
     def get_multiplexes(self):
         """
         Pobiera listę multipleksów (transponderów), aby pobrać ich częstotliwości.
-        Zwraca słownik {mux_uuid: frequency_khz}
+        Zwraca słownik {mux_uuid: frequency_mhz} (multipleksy bez częstotliwości są pomijane)
         """
         try:
-            url = f"{self.base_url}/api/mpegts/multiplex/grid"
-            params = {'start': 0, 'limit': 999999}
-            response = requests.get(url, params=params, auth=self.auth, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            muxes = {}
-            for entry in data.get('entries', []):
-                # Częstotliwość w TVH jest często podana w Hz
-                muxes[entry['uuid']] = entry.get('freq', 0)
-            return muxes
+            # Częstotliwość DVB-S w TVH jest podana w kHz - od razu przeliczamy na MHz
+            return {
+                entry['uuid']: int(entry['freq']) // 1000
+                for entry in self.get_grid('/api/mpegts/multiplex/grid', ('uuid', 'freq'))
+                if entry.get('freq', 0) > 0
+            }
         except Exception as e:
             # Jeśli się nie uda (np. starsza wersja TVH), zwracamy pusty słownik
             print(f"Ostrzeżenie: Nie można pobrać multipleksów: {e}")
@@ -84,12 +181,7 @@ class TVHeadendAPI:
     def get_channels(self):
         """Pobiera wszystkie kanały z TVHeadend"""
         try:
-            url = f"{self.base_url}/api/channel/grid"
-            params = {'start': 0, 'limit': 999999}
-            response = requests.get(url, params=params, auth=self.auth, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('entries', [])
+            return self.get_grid('/api/channel/grid', self.channel_fields)
         except Exception as e:
             raise Exception(f"Błąd pobierania kanałów: {str(e)}")
     
@@ -97,9 +189,9 @@ class TVHeadendAPI:
         """Pobiera listę tagów z TVHeadend"""
         try:
             url = f"{self.base_url}/api/channeltag/grid"
-            response = requests.get(url, auth=self.auth, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             return data.get('entries', [])
         except Exception as e:
             raise Exception(f"Błąd pobierania tagów: {str(e)}")
@@ -111,30 +203,35 @@ class TVHeadendAPI:
             conf = {'name': name, 'comment': comment, 'enabled': True}
             if index is not None:
                 conf['index'] = index
-            data = {'conf': json.dumps(conf)}
-            response = requests.post(url, data=data, auth=self.auth, timeout=10)
+            data = {'conf': json_dumps(conf)}
+            response = self.session.post(url, data=data, timeout=10)
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
         except Exception as e:
             raise Exception(f"Błąd tworzenia tagu: {str(e)}")
     
-    def update_channel(self, channel_uuid, tags=None, number=None, name=None):
-        """Aktualizuje kanał"""
+    @staticmethod
+    def channel_node(channel_uuid, tags=None, number=None, name=None):
+        """Buduje węzeł aktualizacji kanału dla update_channels"""
+        node = {'uuid': channel_uuid}
+        if tags is not None:
+            node['tags'] = tags
+        if number is not None:
+            node['number'] = number
+        if name is not None:
+            node['name'] = name
+        return node
+    
+    def update_channels(self, nodes):
+        """Aktualizuje wiele kanałów jednym zapytaniem (idnode/save przyjmuje listę węzłów)"""
         try:
-            url = f"{self.base_url}/api/channel/create"
-            updates = {'uuid': channel_uuid}
-            if tags is not None:
-                updates['tags'] = tags
-            if number is not None:
-                updates['number'] = number
-            if name is not None:
-                updates['name'] = name
-            data = {'conf': json.dumps(updates)}
-            response = requests.post(url, data=data, auth=self.auth, timeout=10)
+            url = f"{self.base_url}/api/idnode/save"
+            data = {'node': json_dumps(nodes)}
+            response = self.session.post(url, data=data, timeout=10)
             response.raise_for_status()
             return True
         except Exception as e:
-            raise Exception(f"Błąd aktualizacji kanału: {str(e)}")
+            raise Exception(f"Błąd aktualizacji kanałów: {str(e)}")
     
     def create_channel_from_service(self, service_uuid, name, tags=None, number=None):
         """Tworzy kanał z usługi"""
@@ -149,17 +246,20 @@ class TVHeadendAPI:
                 conf['tags'] = tags
             if number:
                 conf['number'] = number
-            data = {'conf': json.dumps(conf)}
-            response = requests.post(url, data=data, auth=self.auth, timeout=10)
+            data = {'conf': json_dumps(conf)}
+            response = self.session.post(url, data=data, timeout=10)
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
         except Exception as e:
             raise Exception(f"Błąd tworzenia kanału: {str(e)}")
 
 class BouquetParser:
     """Klasa do parsowania list kanałów (obsługa specyficzna dla SatKurier.pl z paginacją w nazwie pliku)"""
     
+    max_workers = 8  # równoległe pobieranie podstron
+    
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_channel_name(name):
         """
         Normalizuje nazwę do klucza mapowania.
@@ -168,11 +268,16 @@ class BouquetParser:
         if not name:
             return ""
         
-        normalized = name.lower()
-        normalized = re.sub(r'[^a-z0-9]', '', normalized)
-        return normalized
+        # Nazwa złożona już tylko z małych liter ASCII i cyfr jest gotowym kluczem
+        if name.isascii() and name.isalnum() and name.islower():
+            return name
+        
+        # Znaki spoza ASCII odpadają przy kodowaniu, resztę filtruje tablica translate
+        normalized = name.lower().encode('ascii', 'ignore')
+        return normalized.translate(None, _NON_KEY_BYTES).decode('ascii')
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def clean_channel_name(name):
         """Czyści nazwę kanału do zapisu (usuwa HD, SD, gatunki, parametry)"""
         if not name:
@@ -181,41 +286,75 @@ class BouquetParser:
         cleaned = name
         
         # Gatunki
-        genres = r'\b(muzyczny|informacyjny|uniwersalny|filmowy|sportowy|religijny|dokumentalny|rozrywkowy|dla dzieci|telezakupowy|prawniczy|kulinarny|motoryzacyjny|erotyczny|turystyczny|lifestyle|dla młodzieży)\b'
-        cleaned = re.sub(genres, '', cleaned, flags=re.IGNORECASE)
+        cleaned = _RE_GENRES.sub('', cleaned)
 
         # Parametry techniczne
-        cleaned = re.sub(r'\s*(dvb-[st]\d?(?:/\w+)?|db-s\d?/\w+)\s*', '', cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r'\s*\b(HD|SD|UHD|4K|UD)\b\s*', ' ', cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r'\d{1,2}[.,]\d{3}', '', cleaned)  # częstotliwość (na wypadek jeśli jest w nazwie)
-        cleaned = re.sub(r'\b[VHLR]\b', '', cleaned)
-        cleaned = re.sub(r'\b\d{5}\b', '', cleaned)  # SR
-        cleaned = re.sub(r'\d/\d', '', cleaned)  # FEC
-        cleaned = re.sub(r'\bs\d/\w+\b', '', cleaned, flags=re.IGNORECASE)
-        
-        cleaned = re.sub(r'\s+D\s+D\s*$', '', cleaned)
-        cleaned = re.sub(r'\s+D\s*$', '', cleaned)
-        cleaned = re.sub(r'\s*[-+]\s*$', '', cleaned)
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+        cleaned = _RE_DVB_PARAMS.sub('', cleaned)
+        cleaned = _RE_QUALITY_WORD.sub(' ', cleaned)
+        # Częstotliwość, SR, FEC i modulacja sX/... wymagają cyfry - bez cyfr pomijamy te przejścia
+        if _RE_DIGIT.search(cleaned):
+            cleaned = _RE_FREQ.sub('', cleaned)  # częstotliwość (na wypadek jeśli jest w nazwie)
+            cleaned = _RE_POL.sub('', cleaned)
+            cleaned = _RE_SR.sub('', cleaned)  # SR
+            cleaned = _RE_FEC.sub('', cleaned)  # FEC
+            cleaned = _RE_S_MOD.sub('', cleaned)
+        else:
+            cleaned = _RE_POL.sub('', cleaned)
+        
+        cleaned = _RE_TAIL.sub('', cleaned, count=1)
+        cleaned = _RE_WS.sub(' ', cleaned).strip()
         return cleaned
     
     @staticmethod
     def create_mapping_key(name):
         return BouquetParser.normalize_channel_name(name)
     
+    # Pobrane strony: url -> (nagłówki warunkowe, treść) - ponowne pobranie listy kończy się zwykle na 304.
+    # Pamiętamy najwyżej page_cache_size stron, najstarsze są usuwane (lista to kilka-kilkanaście podstron)
+    page_cache_size = 32
+    _page_cache = {}
+    _page_cache_lock = threading.Lock()
+    
+    @staticmethod
+    def get_page(session, url):
+        """Pobiera stronę warunkowo (ETag / Last-Modified); przy 304 zwraca treść z pamięci"""
+        with BouquetParser._page_cache_lock:
+            cached = BouquetParser._page_cache.get(url)
+        headers = cached[0] if cached else {}
+        response = session.get(url, headers=headers, timeout=10)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        if validators:
+            with BouquetParser._page_cache_lock:
+                cache = BouquetParser._page_cache
+                cache.pop(url, None)  # odświeżona strona trafia na koniec kolejki
+                cache[url] = (validators, response.content)
+                while len(cache) > BouquetParser.page_cache_size:
+                    del cache[next(iter(cache))]
+        return response.content
+    
     @staticmethod
     def parse_satkurier(base_url):
         """Parsowanie listy z obsługą podstron SatKurier (format: nazwa-2.html)"""
         from urllib.parse import urljoin, urlparse
 
+        # Jedna sesja dla strony głównej i podstron - połączenie TLS jest używane ponownie
+        session = requests.Session()
         try:
-            pages_to_process = set([base_url])
-            pages_discovered = set([base_url])
+            # Słownik zamiast zbioru: deduplikacja i kolejność wykrycia stron w jednej strukturze
+            pages = {base_url: None}
+            page_cache = {}  # strona główna jest już pobrana przy wykrywaniu podstron
             
             try:
-                response = requests.get(base_url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
+                page_cache[base_url] = BouquetParser.get_page(session, base_url)
+                soup = BeautifulSoup(page_cache[base_url], HTML_PARSER, parse_only=_LINKS_ONLY)
                 
                 # Analiza podstawowej nazwy pliku URL do wykrywania wzorca podstron
                 parsed_base = urlparse(base_url)
@@ -226,7 +365,7 @@ class BouquetParser:
                 
                 # Usuwamy ending number z aktualnego URL, aby znaleźć "korzeń" (root)
                 # np. lista-kanalow-canal-1 -> lista-kanalow-canal
-                base_name_no_ext = re.sub(r'-\d+$', '', base_name_no_ext)
+                base_name_no_ext = _RE_PAGE_SUFFIX.sub('', base_name_no_ext)
                 
                 for link in soup.find_all('a', href=True):
                     href = link['href']
@@ -234,9 +373,7 @@ class BouquetParser:
                     
                     # Sprawdzenie 1: Standardowa paginacja (?page=2)
                     if 'page=' in href.lower():
-                        if full_url not in pages_discovered:
-                            pages_to_process.add(full_url)
-                            pages_discovered.add(full_url)
+                        pages.setdefault(full_url, None)
                         continue
                     
                     # Sprawdzenie 2: Specyficzna dla SatKurier (format pliku: nazwa-2.html)
@@ -253,99 +390,106 @@ class BouquetParser:
                     if link_name_no_ext.startswith(base_name_no_ext):
                         # Sprawdzamy czy link ma sufiks numeryczny (oznaczający podstronę)
                         suffix = link_name_no_ext[len(base_name_no_ext):]
-                        if re.match(r'-\d+$', suffix):
-                            if full_url not in pages_discovered:
-                                pages_to_process.add(full_url)
-                                pages_discovered.add(full_url)
+                        if _RE_PAGE_SUFFIX.match(suffix):
+                            pages.setdefault(full_url, None)
                                 
             except Exception as e:
                 print(f"Ostrzeżenie: Błąd wykrywania podstron: {e}")
 
-            print(f"Znaleziono {len(pages_to_process)} stron do przetworzenia.")
+            print(f"Znaleziono {len(pages)} stron do przetworzenia.")
             all_bouquets = {}
             
-            for page_url in pages_to_process:
-                try:
-                    print(f"Pobieranie: {page_url}")
-                    r = requests.get(page_url, timeout=10)
-                    r.raise_for_status()
-                    s = BeautifulSoup(r.content, 'html.parser')
+            def fetch_page(page_url):
+                if page_url in page_cache:
+                    return page_cache[page_url]
+                print(f"Pobieranie: {page_url}")
+                return BouquetParser.get_page(session, page_url)
+
+            # Strony pobieramy równolegle, parsujemy po kolei w wątku wywołującym
+            with ThreadPoolExecutor(max_workers=BouquetParser.max_workers) as executor:
+                futures = [(page_url, executor.submit(fetch_page, page_url)) for page_url in pages]
+                for page_url, future in futures:
+                    try:
+                        s = BeautifulSoup(future.result(), HTML_PARSER, parse_only=_TABLES_ONLY)
                     
-                    page_channels = []
-                    current_category = "Bez kategorii"
-                    tables = s.find_all('table')
+                        page_channels = []
+                        current_category = "Bez kategorii"
+                        tables = s.find_all('table')
                     
-                    for table in tables:
-                        rows = table.find_all('tr')
-                        name_col_index = -1
-                        freq_col_index = -1
-                        header_detected = False
+                        for table in tables:
+                            if table.find_parent('table') is not None:
+                                # Tabela zagnieżdżona - jej wiersze przeszła już tabela zewnętrzna, w kolejności dokumentu
+                                continue
+                            rows = table.find_all('tr')
+                            name_col_index = -1
+                            freq_col_index = -1
+                            header_detected = False
                         
-                        for row in rows:
-                            cells = row.find_all(['td', 'th'])
-                            if not cells: continue
+                            for row in rows:
+                                cells = row.find_all(['td', 'th'])
+                                if not cells: continue
                             
-                            header_texts = [cell.get_text(strip=True).lower() for cell in cells]
-                            keywords = ['nazwa', 'name', 'częstotliwość', 'freq', 'transponder', 'tp', 'pol', 'sr', 'dostawca', 'nr', 'rozdzielczość', 'parametry']
-                            match_count = sum(1 for kw in keywords if kw in ' '.join(header_texts))
+                                header_texts = [cell.get_text(strip=True).lower() for cell in cells]
+                                header_str = ' '.join(header_texts)
+                                # Nagłówek = co najmniej 2 słowa kluczowe; przerywamy po drugim trafieniu
+                                keyword_hits = (kw for kw in _HEADER_KEYWORDS if kw in header_str)
+                                is_header = next(keyword_hits, None) is not None and next(keyword_hits, None) is not None
                             
-                            if match_count >= 2:
-                                for i, text in enumerate(header_texts):
-                                    if 'nazwa' in text and 'pakiet' not in text and 'gatunek' not in text:
-                                        name_col_index = i
-                                    if 'freq' in text or 'częstotliwość' in text:
-                                        freq_col_index = i
+                                if is_header:
+                                    for i, text in enumerate(header_texts):
+                                        if 'nazwa' in text and 'pakiet' not in text and 'gatunek' not in text:
+                                            name_col_index = i
+                                        if 'freq' in text or 'częstotliwość' in text:
+                                            freq_col_index = i
                                         
-                                header_detected = True
-                                continue
+                                    header_detected = True
+                                    continue
                             
-                            if len(cells) == 1 and cells[0].get('colspan'):
-                                header_text = cells[0].get_text(strip=True)
-                                if header_text and len(header_text) > 2:
-                                    current_category = header_text
-                                continue
+                                if len(cells) == 1 and cells[0].get('colspan'):
+                                    header_text = cells[0].get_text(strip=True)
+                                    if header_text and len(header_text) > 2:
+                                        current_category = header_text
+                                    continue
                             
-                            if len(cells) < 2: continue
+                                if len(cells) < 2: continue
                                 
-                            # Pobranie nazwy
-                            raw_name = ""
-                            if name_col_index != -1 and name_col_index < len(cells):
-                                raw_name = cells[name_col_index].get_text(separator=' ', strip=True)
-                            else:
-                                raw_name = ' '.join([cell.get_text(separator=' ', strip=True) for cell in cells])
+                                # Pobranie nazwy
+                                raw_name = ""
+                                if name_col_index != -1 and name_col_index < len(cells):
+                                    raw_name = cells[name_col_index].get_text(separator=' ', strip=True)
+                                else:
+                                    raw_name = row.get_text(separator=' ', strip=True)
                             
-                            # Pobranie częstotliwości
-                            raw_freq = ""
-                            if freq_col_index != -1 and freq_col_index < len(cells):
-                                raw_freq = cells[freq_col_index].get_text(separator=' ', strip=True)
+                                # Pobranie częstotliwości
+                                raw_freq = ""
+                                if freq_col_index != -1 and freq_col_index < len(cells):
+                                    raw_freq = cells[freq_col_index].get_text(separator=' ', strip=True)
                             
-                            if not raw_name or raw_name.isdigit(): continue
-                            if re.match(r'^[\s\-_=]+$', raw_name) or len(raw_name) < 3: continue
+                                # Najpierw tani test długości (obejmuje też pustą nazwę), regex na końcu
+                                if len(raw_name) < 3 or raw_name.isdigit() or _RE_JUNK_ROW.match(raw_name): continue
                             
-                            header_str = ' '.join(header_texts)
-                            if any(kw in header_str for kw in ['nr nazwa', 'rozdzielczość parametry', 'parametry techniczne']):
-                                continue
+                                if any(phrase in header_str for phrase in _HEADER_PHRASES):
+                                    continue
 
-                            channel_info = BouquetParser.parse_channel_info(raw_name, raw_freq)
-                            if channel_info and channel_info['name']:
-                                channel_info['category'] = current_category
-                                page_channels.append(channel_info)
+                                channel_info = BouquetParser.parse_channel_info(raw_name, raw_freq)
+                                if channel_info and channel_info['name']:
+                                    channel_info['category'] = current_category
+                                    page_channels.append(channel_info)
                     
-                    for ch in page_channels:
-                        cat = ch['category']
-                        if cat not in all_bouquets: all_bouquets[cat] = []
-                        all_bouquets[cat].append(ch)
+                        # Grupowanie i numeracja w obrębie kategorii w jednym przebiegu
+                        for ch in page_channels:
+                            bouquet = all_bouquets.setdefault(ch['category'], [])
+                            bouquet.append(ch)
+                            ch['number'] = len(bouquet)
                         
-                except Exception as e:
-                    print(f"Błąd strony {page_url}: {e}")
-
-            for cat in all_bouquets:
-                for idx, ch in enumerate(all_bouquets[cat], 1):
-                    ch['number'] = idx
+                    except Exception as e:
+                        print(f"Błąd strony {page_url}: {e}")
             
             return all_bouquets
         except Exception as e:
             raise Exception(f"Błąd parsowania: {str(e)}")
+        finally:
+            session.close()
     
     @staticmethod
     def parse_channel_info(text, freq_text=None):
@@ -353,46 +497,64 @@ class BouquetParser:
         Parsuje informacje o kanale. 
         freq_text: opcjonalny tekst częstotliwości z osobnej kolumny.
         """
-        text = re.sub(r'^\d+\.?\s*', '', text)
-        if not text or len(text) < 2: return None
-        
-        info = {
-            'name': '', 'full_text': text, 'quality': '', 'frequency': '', 
-            'polarization': '', 'symbol_rate': '', 'fec': '', 'modulation': ''
-        }
-        
-        if freq_text:
-            freq_match = re.search(r'(\d{1,2}[.,]\d{3})', freq_text)
-            if freq_match:
-                info['frequency'] = freq_match.group(1)
-        else:
-            freq_match = re.search(r'(\d{1,2}[.,]\d{3})', text)
-            if freq_match: info['frequency'] = freq_match.group(1)
+        text = _RE_LEADING_NUM.sub('', text)
+        # Śmieciowe komórki (same cyfry / białe znaki) odpadają przed regexami
+        if not text or len(text) < 2 or text.isdigit() or text.isspace(): return None
         
-        pol_match = re.search(r'\b([VHLR])\b', text)
-        if pol_match: info['polarization'] = pol_match.group(1)
+        # Z parametrów technicznych ImportWorker korzysta tylko z częstotliwości:
+        # z osobnej kolumny, a gdy jej brak - z samego tekstu
+        freq_match = _RE_FREQ.search(freq_text or text)
+        frequency = freq_match.group(1) if freq_match else ''
         
-        sr_match = re.search(r'\b(\d{5})\b', text)
-        if sr_match: info['symbol_rate'] = sr_match.group(1)
-        
-        fec_match = re.search(r'(\d/\d)', text)
-        if fec_match: info['fec'] = fec_match.group(1)
-        
-        mod_match = re.search(r'(DVB-[ST]\d?(?:/\w+)?|DB-S\d?/\w+)', text, flags=re.IGNORECASE)
-        if mod_match: info['modulation'] = mod_match.group(1)
-        
-        quality_match = re.search(r'\b(HD|SD|UHD|4K|UD)\b', text, flags=re.IGNORECASE)
-        if quality_match: info['quality'] = quality_match.group(1).upper()
+        info = {'name': '', 'full_text': text, 'frequency': frequency}
+        info['freq_mhz'] = _freq_to_mhz(info['frequency'])
         
         info['name'] = BouquetParser.clean_channel_name(text)
+        info['mapping_key'] = BouquetParser.create_mapping_key(info['name'])
         return info
 
+class ServicesWorker(QThread):
+    """Wątek pobierający usługi z TVHeadend (połączenie nie blokuje okna)"""
+    
+    finished = pyqtSignal(object, str)  # lista usług (None przy błędzie), komunikat błędu
+    
+    def __init__(self, api):
+        super().__init__()
+        self.api = api
+    
+    def run(self):
+        try:
+            self.finished.emit(self.api.get_services(), "")
+        except Exception as e:
+            self.finished.emit(None, str(e))
+
+class ParseWorker(QThread):
+    """Wątek pobierający i parsujący listę kanałów (parsowanie nie blokuje okna)"""
+    
+    finished = pyqtSignal(object, str)  # bukiety (None przy błędzie), komunikat błędu
+    
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+    
+    def run(self):
+        try:
+            self.finished.emit(BouquetParser.parse_satkurier(self.url), "")
+        except Exception as e:
+            self.finished.emit(None, str(e))
+
 class ImportWorker(QThread):
     """Wątek do importu (poprawiona obsługa częstotliwości)"""
     
     progress = pyqtSignal(int, str)
     finished = pyqtSignal(bool, str)
     
+    # Liczba równoległych zapisów kanałów do TVHeadend
+    max_workers = 8
+    # Minimalny odstęp (s) między sygnałami postępu - komunikaty z przerwy idą razem
+    progress_interval = 0.25
+    update_batch_size = 100  # węzłów w jednym zapisie idnode/save
+    
     def __init__(self, api, bouquets, services, use_service_names=True, create_tags=True):
         super().__init__()
         self.api = api
@@ -400,23 +562,30 @@ class ImportWorker(QThread):
         self.services = services
         self.use_service_names = use_service_names
         self.create_tags = create_tags
+        self._pending_messages = []
+        self._progress_value = 0
+        self._last_emit = 0.0
         
-    def get_freq_mhz_from_str(self, freq_str):
-        """Konwertuje string częstotliwości (np. '11,508' lub '11642') na MHz (int)"""
-        if not freq_str:
-            return 0
-        
-        freq_str = freq_str.replace(',', '.')
-        try:
-            val = float(freq_str)
-            # Jeśli wartość jest poniżej 1000, to pewnie GHz (np. 11.508), zamień na MHz
-            if val < 1000:
-                return int(val * 1000)
-            else:
-                return int(val)
-        except:
-            return 0
-
+    def report_progress(self, value, message):
+        """Buforuje komunikat i wysyła sygnał progress najwyżej raz na progress_interval"""
+        self._progress_value = value
+        self._pending_messages.append(message)
+        if time.monotonic() - self._last_emit >= self.progress_interval:
+            self.flush_progress()
+    
+    def flush_progress(self):
+        """Wysyła zbuforowane komunikaty postępu jednym sygnałem"""
+        if self._pending_messages:
+            self.progress.emit(self._progress_value, '\n'.join(self._pending_messages))
+            self._pending_messages = []
+        self._last_emit = time.monotonic()
+    
+    def wait_result(self, future):
+        """Zwraca wynik future; przed blokującym czekaniem wysyła zbuforowane komunikaty"""
+        if not future.done():
+            self.flush_progress()
+        return future.result()
+    
     def run(self):
         try:
             total_channels = sum(len(channels) for channels in self.bouquets.values())
@@ -425,13 +594,20 @@ class ImportWorker(QThread):
             created_channels = 0
             updated_channels = 0
             
-            self.progress.emit(0, "Pobieranie istniejących tagów...")
-            existing_tags = {tag['name']: tag['uuid'] for tag in self.api.get_tags()}
+            # Tagi, multipleksy i kanały serwera są od siebie niezależne - pobieramy je równolegle
+            prefetch = ThreadPoolExecutor(max_workers=3)
+            tags_future = prefetch.submit(self.api.get_tags)
+            muxes_future = prefetch.submit(self.api.get_multiplexes)
+            channels_future = prefetch.submit(self.api.get_channels)
+            prefetch.shutdown(wait=False)
             
-            self.progress.emit(5, "Pobieranie multipleksów...")
-            multiplexes = self.api.get_multiplexes()
+            self.report_progress(0, "Pobieranie istniejących tagów...")
+            existing_tags = {tag['name']: tag['uuid'] for tag in self.wait_result(tags_future)}
             
-            self.progress.emit(10, "Tworzenie mapy usług z częstotliwościami...")
+            self.report_progress(5, "Pobieranie multipleksów...")
+            multiplexes = self.wait_result(muxes_future)
+            
+            self.report_progress(10, "Tworzenie mapy usług z częstotliwościami...")
             services_map = {}
             
             for service in self.services:
@@ -439,134 +615,146 @@ class ImportWorker(QThread):
                 if not name:
                     continue
                 
-                mapping_key = BouquetParser.create_mapping_key(name)
+                # Klucz zapisany na usłudze - kolejne importy w tej sesji go nie przeliczają
+                mapping_key = service.get('mapping_key')
+                if mapping_key is None:
+                    mapping_key = service['mapping_key'] = BouquetParser.create_mapping_key(name)
+                if not mapping_key:
+                    continue  # kanały z listy bez klucza i tak są pomijane
                 
                 # Pobranie częstotliwości z TVHeadend
                 mux_uuid = service.get('multiplex_uuid')
-                freq_khz = multiplexes.get(mux_uuid, 0)
-                freq_mhz = int(freq_khz / 1000) if freq_khz > 0 else 0
+                freq_mhz = multiplexes.get(mux_uuid, 0)
                 
                 master_key = (mapping_key, freq_mhz)
                 
-                if master_key not in services_map:
-                    services_map[master_key] = service
+                services_map.setdefault(master_key, service)
             
-            self.progress.emit(15, f"Mapa usług: {len(services_map)} unikalnych par (Nazwa+Frequ)")
+            self.report_progress(15, f"Mapa usług: {len(services_map)} unikalnych par (Nazwa+Frequ)")
             
-            self.progress.emit(16, "Pobieranie istniejących kanałów...")
-            existing_channels = self.api.get_channels()
-            channels_by_service = {}
-            for ch in existing_channels:
-                services = ch.get('services', [])
-                if services:
-                    for svc_uuid in services:
-                        channels_by_service[svc_uuid] = ch
+            self.report_progress(16, "Pobieranie istniejących kanałów...")
+            existing_channels = self.wait_result(channels_future)
+            channels_by_service = {
+                svc_uuid: ch
+                for ch in existing_channels
+                for svc_uuid in ch.get('services') or []
+            }
             
-            self.progress.emit(18, f"Znaleziono {len(existing_channels)} istniejących kanałów")
+            self.report_progress(18, f"Znaleziono {len(existing_channels)} istniejących kanałów")
             
             processed_services = set()
             tag_index = 0
             
-            for category, channels in self.bouquets.items():
-                self.progress.emit(
-                    18 + int((processed / total_channels) * 72),
-                    f"Przetwarzam kategorię: {category}"
-                )
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for category, channels in self.bouquets.items():
+                    # Procent postępu liczony raz (arytmetyka całkowita) i używany we wszystkich komunikatach
+                    pct = 18 + processed * 72 // total_channels
+                    self.report_progress(
+                        pct,
+                        f"Przetwarzam kategorię: {category}"
+                    )
                 
-                tag_uuid = None
-                if self.create_tags:
-                    if category in existing_tags:
-                        tag_uuid = existing_tags[category]
-                    else:
-                        result = self.api.create_tag(category, f"Importowane z listy", tag_index)
-                        tag_uuid = result.get('uuid')
-                        existing_tags[category] = tag_uuid
-                        tag_index += 1
+                    tag_uuid = None
+                    if self.create_tags:
+                        if category in existing_tags:
+                            tag_uuid = existing_tags[category]
+                        else:
+                            self.flush_progress()
+                            result = self.api.create_tag(category, f"Importowane z listy", tag_index)
+                            tag_uuid = result.get('uuid')
+                            existing_tags[category] = tag_uuid
+                            tag_index += 1
                 
-                for channel_info in channels:
-                    original_name = channel_info['name']
-                    channel_number = channel_info['number']
+                    # Wpisy (rodzaj, future lub numer paczki, komunikat) w kolejności listy - także pominięcia,
+                    # żeby log zachował kolejność kanałów
+                    pending = []
+                    batches = []  # futures paczek aktualizacji idnode/save
+                    updates = []
+                    for channel_info in channels:
+                        original_name = channel_info['name']
+                        channel_number = channel_info['number']
                     
-                    mapping_key = BouquetParser.create_mapping_key(original_name)
+                        mapping_key = channel_info['mapping_key']
                     
-                    # Częstotliwość z listy zdalnej (teraz powinna być poprawnie wyciągnięta z kolumny)
-                    remote_freq_str = channel_info.get('frequency', '')
-                    remote_freq_mhz = self.get_freq_mhz_from_str(remote_freq_str)
+                        # Częstotliwość z listy zdalnej (MHz wyliczone już przy parsowaniu)
+                        remote_freq_mhz = channel_info['freq_mhz']
                     
-                    remote_key = (mapping_key, remote_freq_mhz)
+                        remote_key = (mapping_key, remote_freq_mhz)
                     
-                    if not mapping_key:
-                        self.progress.emit(
-                            18 + int((processed / total_channels) * 72),
-                            f"  ✗ Pominięto (brak nazwy): {original_name}"
-                        )
-                        processed += 1
-                        continue
-                    
-                    if remote_key in services_map:
-                        service = services_map[remote_key]
-                        service_uuid = service['uuid']
-                        
-                        if service_uuid in processed_services:
-                            self.progress.emit(
-                                18 + int((processed / total_channels) * 72),
-                                f"  ⊗ Pominięto (duplikat): {original_name} [{remote_freq_mhz} MHz]"
-                            )
+                        if not mapping_key:
+                            pending.append(('log', None, f"  ✗ Pominięto (brak nazwy): {original_name}"))
                             processed += 1
                             continue
+                    
+                        if remote_key in services_map:
+                            service = services_map[remote_key]
+                            service_uuid = service['uuid']
                         
-                        processed_services.add(service_uuid)
+                            if service_uuid in processed_services:
+                                pending.append(('log', None, f"  ⊗ Pominięto (duplikat): {original_name} [{remote_freq_mhz} MHz]"))
+                                processed += 1
+                                continue
                         
-                        if self.use_service_names:
-                            final_name = BouquetParser.clean_channel_name(service.get('svcname', ''))
-                        else:
-                            final_name = BouquetParser.clean_channel_name(original_name)
+                            processed_services.add(service_uuid)
                         
-                        service_original = service.get('svcname', '')
+                            if self.use_service_names:
+                                final_name = BouquetParser.clean_channel_name(service.get('svcname', ''))
+                            else:
+                                final_name = BouquetParser.clean_channel_name(original_name)
                         
-                        if service_uuid in channels_by_service:
-                            # Aktualizacja
-                            existing_channel = channels_by_service[service_uuid]
-                            tags = existing_channel.get('tags', [])
-                            if tag_uuid and tag_uuid not in tags:
-                                tags.append(tag_uuid)
+                            service_original = service.get('svcname', '')
+                        
+                            if service_uuid in channels_by_service:
+                                # Aktualizacja
+                                existing_channel = channels_by_service[service_uuid]
+                                tags = existing_channel.get('tags', [])
+                                if tag_uuid and tag_uuid not in tags:
+                                    tags.append(tag_uuid)
                             
-                            self.api.update_channel(
-                                existing_channel['uuid'],
-                                tags=tags,
-                                number=channel_number,
-                                name=final_name
-                            )
-                            updated_channels += 1
-                            self.progress.emit(
-                                18 + int((processed / total_channels) * 72),
-                                f"  ✓ Zaktualizowano: {final_name} [{remote_freq_mhz} MHz]"
-                            )
-                        else:
-                            # Tworzenie
-                            tags = [tag_uuid] if tag_uuid else []
-                            self.api.create_channel_from_service(
-                                service_uuid,
-                                final_name,
-                                tags=tags,
-                                number=channel_number
-                            )
-                            created_channels += 1
-                            self.progress.emit(
-                                18 + int((processed / total_channels) * 72),
-                                f"  ✓ Utworzono: {final_name} [{remote_freq_mhz} MHz]"
-                            )
+                                updates.append(TVHeadendAPI.channel_node(
+                                    existing_channel['uuid'],
+                                    tags=tags,
+                                    number=channel_number,
+                                    name=final_name
+                                ))
+                                pending.append(('update', len(batches), f"  ✓ Zaktualizowano: {final_name} [{remote_freq_mhz} MHz]"))
+                                if len(updates) >= self.update_batch_size:
+                                    batches.append(executor.submit(self.api.update_channels, updates))
+                                    updates = []
+                            else:
+                                # Tworzenie
+                                tags = [tag_uuid] if tag_uuid else []
+                                future = executor.submit(
+                                    self.api.create_channel_from_service,
+                                    service_uuid,
+                                    final_name,
+                                    tags=tags,
+                                    number=channel_number
+                                )
+                                pending.append(('create', future, f"  ✓ Utworzono: {final_name} [{remote_freq_mhz} MHz]"))
                         
-                        matched += 1
-                    else:
-                        self.progress.emit(
-                            18 + int((processed / total_channels) * 72),
-                            f"  ✗ Nie znaleziono: {original_name} [{remote_freq_mhz} MHz]"
-                        )
+                            matched += 1
+                        else:
+                            pending.append(('log', None, f"  ✗ Nie znaleziono: {original_name} [{remote_freq_mhz} MHz]"))
+                    
+                        processed += 1
+                    
+                    if updates:
+                        batches.append(executor.submit(self.api.update_channels, updates))
                     
-                    processed += 1
+                    pct = 18 + processed * 72 // total_channels
+                    # Zapisy kanałów z kategorii idą równolegle (aktualizacje paczkami), wyniki zbieramy w kolejności
+                    for kind, ref, message in pending:
+                        if kind == 'update':
+                            self.wait_result(batches[ref])
+                            updated_channels += 1
+                        elif kind == 'create':
+                            self.wait_result(ref)
+                            created_channels += 1
+                        self.report_progress(pct, message)
             
-            self.progress.emit(100, "Import zakończony!")
+            self.report_progress(100, "Import zakończony!")
+            self.flush_progress()
             summary = (
                 f"Import zakończony!\n\n"
                 f"Przetworzono: {processed} kanałów\n"
@@ -578,13 +766,46 @@ class ImportWorker(QThread):
             self.finished.emit(True, summary)
             
         except Exception as e:
+            self.flush_progress()
             self.finished.emit(False, f"Błąd importu: {str(e)}")
+class ServicesModel(QAbstractTableModel):
+    """Model tabeli usług czytający wprost z listy słowników (bez QTableWidgetItem na komórkę)"""
+    
+    columns = ('svcname', 'svctype', 'uuid')
+    headers = ("Nazwa usługi", "Typ", "UUID")
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.services = []
+    
+    def set_services(self, services):
+        self.beginResetModel()
+        self.services = services
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.services)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return self.services[index.row()].get(self.columns[index.column()], '')
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.api = None
         self.services = []
         self.bouquets = {}
+        self.parse_worker = None
         self.init_ui()
         
     def init_ui(self):
@@ -656,6 +877,7 @@ class MainWindow(QMainWindow):
         
         self.preview_text = QTextEdit()
         self.preview_text.setReadOnly(True)
+        self.preview_text.setUndoRedoEnabled(False)  # podgląd tylko do odczytu - bez stosu cofania
         preview_layout.addWidget(self.preview_text)
         
         tabs.addTab(preview_tab, "Podgląd listy")
@@ -663,9 +885,9 @@ class MainWindow(QMainWindow):
         services_tab = QWidget()
         services_layout = QVBoxLayout(services_tab)
         
-        self.services_table = QTableWidget()
-        self.services_table.setColumnCount(3)
-        self.services_table.setHorizontalHeaderLabels(["Nazwa usługi", "Typ", "UUID"])
+        self.services_model = ServicesModel(self)
+        self.services_table = QTableView()
+        self.services_table.setModel(self.services_model)
         self.services_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         services_layout.addWidget(self.services_table)
         
@@ -707,64 +929,109 @@ class MainWindow(QMainWindow):
         layout.addWidget(import_group)
         
     def connect_tvh(self):
+        host = self.host_input.text()
+        port = self.port_input.text()
+        user = self.user_input.text()
+        password = self.pass_input.text()
+        
+        api = TVHeadendAPI(host, port, user, password)
+        
+        # Pobieranie usług w osobnym wątku - okno nie zamarza na czas zapytań.
+        # self.api podmieniamy dopiero po udanym połączeniu, a import w tym czasie jest zablokowany
+        self.connect_btn.setEnabled(False)
+        self.import_btn.setEnabled(False)
+        self.services_label.setText("Status: Łączenie...")
+        self.services_worker = ServicesWorker(api)
+        self.services_worker.finished.connect(self.services_loaded)
+        self.services_worker.start()
+    
+    def services_loaded(self, services, error):
+        self.connect_btn.setEnabled(True)
+        api = self.services_worker.api
         try:
-            host = self.host_input.text()
-            port = self.port_input.text()
-            user = self.user_input.text()
-            password = self.pass_input.text()
-            
-            self.api = TVHeadendAPI(host, port, user, password)
-            self.services = self.api.get_services()
+            if services is None:
+                api.close()
+                raise Exception(error)
+            # Poprzednia sesja nie jest już potrzebna - zamykamy jej połączenia
+            if self.api:
+                self.api.close()
+            self.api = api
+            self.services = services
             
             self.services_label.setText(f"Status: Połączony - znaleziono {len(self.services)} usług")
-            self.parse_btn.setEnabled(True)
+            # Nie w trakcie parsowania - przycisk włączy wtedy bouquet_parsed
+            self.parse_btn.setEnabled(not self.parse_running())
             
-            self.services_table.setRowCount(len(self.services))
-            for i, service in enumerate(self.services):
-                self.services_table.setItem(i, 0, QTableWidgetItem(service.get('svcname', '')))
-                self.services_table.setItem(i, 1, QTableWidgetItem(service.get('svctype', '')))
-                self.services_table.setItem(i, 2, QTableWidgetItem(service.get('uuid', '')))
+            # Model czyta wprost z listy usług - widok pyta tylko o widoczne wiersze
+            self.services_model.set_services(self.services)
             
             self.status_text.append(f"✓ Połączono z TVHeadend ({len(self.services)} usług)")
             
         except Exception as e:
             QMessageBox.critical(self, "Błąd połączenia", str(e))
             self.services_label.setText("Status: Błąd połączenia")
+        finally:
+            self.import_btn.setEnabled(bool(self.api and self.services and self.bouquets))
+    
+    def parse_running(self):
+        return self.parse_worker is not None and self.parse_worker.isRunning()
     
     def parse_bouquet(self):
+        # Drugi wątek nie może zastąpić działającego
+        if self.parse_running():
+            return
+        url = self.url_input.text()
+        if not url:
+            QMessageBox.warning(self, "Błąd", "Podaj URL listy kanałów")
+            return
+        
+        # Pobieranie i parsowanie listy w osobnym wątku - okno nie zamarza
+        self.parse_btn.setEnabled(False)
+        self.parse_worker = ParseWorker(url)
+        self.parse_worker.finished.connect(self.bouquet_parsed)
+        self.parse_worker.start()
+    
+    def bouquet_parsed(self, bouquets, error):
+        self.parse_btn.setEnabled(True)
         try:
-            url = self.url_input.text()
-            if not url:
-                QMessageBox.warning(self, "Błąd", "Podaj URL listy kanałów")
-                return
-            
-            self.bouquets = BouquetParser.parse_satkurier(url)
+            if bouquets is None:
+                raise Exception(error)
+            self.bouquets = bouquets
             
-            preview = ""
+            # Fragmenty podglądu zbieramy w liście i łączymy raz na końcu
+            preview = []
             total_channels = 0
             for category, channels in self.bouquets.items():
-                preview += f"\n{'='*80}\n{category} ({len(channels)} kanałów)\n{'='*80}\n"
-                for ch in channels[:10]:
-                    preview += f"{ch['number']:3d}. {ch['name']}\n"
+                count = len(channels)
+                preview.append(f"\n{'='*80}\n{category} ({count} kanałów)\n{'='*80}\n")
+                preview.extend(f"{ch['number']:3d}. {ch['name']}\n" for ch in islice(channels, 10))
                 
-                if len(channels) > 10:
-                    preview += f"... i {len(channels) - 10} więcej\n"
-                total_channels += len(channels)
+                if count > 10:
+                    preview.append(f"... i {count - 10} więcej\n")
+                total_channels += count
             
-            self.preview_text.setText(preview)
+            self.preview_text.setPlainText(''.join(preview))
             self.status_text.append(f"✓ Pobrano listę: {len(self.bouquets)} kategorii, {total_channels} kanałów")
             
-            if self.services:
+            # Nie w trakcie łączenia ani importu (wtedy przycisk "Połącz" jest wyłączony)
+            if self.services and self.connect_btn.isEnabled():
                 self.import_btn.setEnabled(True)
             
         except Exception as e:
             QMessageBox.critical(self, "Błąd parsowania", str(e))
     
+    def closeEvent(self, event):
+        # Zamykamy połączenia keep-alive do TVHeadend razem z oknem
+        if self.api:
+            self.api.close()
+        super().closeEvent(event)
+    
     def start_import(self):
         if not self.api or not self.bouquets:
             return
         
         self.import_btn.setEnabled(False)
+        self.connect_btn.setEnabled(False)  # ponowne połączenie zamknęłoby sesję używaną przez import
         use_service_names = self.use_server_names.isChecked()
         create_tags = self.create_tags_check.isChecked()
         
@@ -779,6 +1046,7 @@ class MainWindow(QMainWindow):
     
     def import_finished(self, success, message):
         self.import_btn.setEnabled(True)
+        self.connect_btn.setEnabled(True)
         if success:
             QMessageBox.information(self, "Sukces", message)
         else:
@@ -10,63 +10,138 @@ Główne zmiany:
 
 import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
-from bs4 import BeautifulSoup
+import string
+import threading
+import time
+from bs4 import BeautifulSoup, SoupStrainer
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                              QTextEdit, QProgressBar, QGroupBox, QTabWidget,
-                             QTableWidget, QTableWidgetItem, QHeaderView,
+                             QTableView, QHeaderView,
                              QMessageBox, QCheckBox)
-from PyQt6.QtCore import QThread, pyqtSignal, Qt
+from PyQt6.QtCore import QThread, pyqtSignal, Qt, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QFont
 import json
+from functools import lru_cache
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import lxml  # noqa: F401 - parser w C, znacznie szybszy od html.parser
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+try:
+    import orjson  # szybsze (de)serializowanie JSON zapytań do TVHeadend
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+# Budujemy drzewo tylko z tabel kanałów, reszta strony jest pomijana
+_TABLES_ONLY = SoupStrainer('table')
+
+# Wzorce wyrażeń regularnych kompilowane raz przy imporcie modułu
+_RE_GENRES = re.compile(r'\b(muzyczny|informacyjny|uniwersalny|filmowy|sportowy|religijny|dokumentalny|rozrywkowy|dla dzieci|telezakupowy|prawniczy|kulinarny|motoryzacyjny|erotyczny|turystyczny|lifestyle)\b', re.IGNORECASE)
+_RE_DVB_PARAMS = re.compile(r'\s*(dvb-[st]\d?(?:/\w+)?|db-s\d?/\w+)\s*', re.IGNORECASE)
+_RE_QUALITY_WORD = re.compile(r'\s*\b(HD|SD|UHD|4K|UD)\b\s*', re.IGNORECASE)
+_RE_FREQ = re.compile(r'(\d{1,2}[.,]\d{3})')
+_RE_POL = re.compile(r'\b([VHLR])\b')
+_RE_SR = re.compile(r'\b(\d{5})\b')
+_RE_FEC = re.compile(r'(\d/\d)')
+_RE_S_MOD = re.compile(r'\bs\d/\w+\b', re.IGNORECASE)
+# Końcówka nazwy: opcjonalny znak -/+ i do trzech ' D' (to samo co kolejno ' D D', ' D', '-')
+_RE_TAIL = re.compile(r'(?:\s*[-+])?(?:\s+D){0,3}\s*$')
+_RE_DIGIT = re.compile(r'\d')
+_RE_WS = re.compile(r'\s+')
+_RE_LEADING_NUM = re.compile(r'^\d+\.?\s*')
+_RE_JUNK_ROW = re.compile(r'^[\s\-_]+$')
+# Bajty ASCII spoza klucza mapowania (wszystko oprócz liter) - do bytes.translate
+_NON_KEY_BYTES = bytes(c for c in range(128) if chr(c) not in string.ascii_lowercase)
 
 
 class TVHeadendAPI:
     """Klasa do komunikacji z TVHeadend API"""
     
+    # Maksymalna liczba równoległych zapytań do serwera
+    max_workers = 8
+    
+    # Pola usług, z których korzysta GUI i ImportWorker
+    service_fields = ('uuid', 'svcname', 'svctype')
+    # Pola kanałów, z których korzysta ImportWorker
+    channel_fields = ('uuid', 'services', 'tags')
+    
     def __init__(self, host, port, username="", password=""):
         self.base_url = f"http://{host}:{port}"
         self.auth = (username, password) if username else None
+        # Jedna sesja HTTP (keep-alive) dla wszystkich zapytań do serwera
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        # Pula mieści równoległe pobieranie stron (prefetch) i zapisy; chwilowe 502/503/504 ponawiamy
+        # tylko dla GET - ponowienie POST channel/create mogłoby utworzyć kanał dwa razy
+        retries = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                        allowed_methods=frozenset(['GET']))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=retries)
+        self.session.mount('http://', adapter)
+    
+    def close(self):
+        """Zamyka pulę połączeń sesji"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
         
+    def get_grid(self, path, fields=None, limit=500):
+        """Pobiera wszystkie wpisy siatki API stronami po 'limit' (opcjonalnie tylko wybrane pola)"""
+        url = f"{self.base_url}{path}"
+        
+        def fetch_page(start):
+            params = {'start': start, 'limit': limit}
+            response = self.session.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            data = json_loads(response.content)
+            entries = data.get('entries', [])
+            if fields:
+                # Zostawiamy tylko pola używane przez aplikację, surowa strona jest od razu zwalniana
+                entries = [
+                    {field: entry[field] for field in fields if field in entry}
+                    for entry in entries
+                ]
+            return entries, data.get('total', 0)
+        
+        # Pierwsza strona podaje 'total' - pozostałe strony pobieramy równolegle
+        all_entries, total = fetch_page(0)
+        
+        offsets = range(limit, total, limit) if all_entries else []
+        if offsets:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for entries, _ in executor.map(fetch_page, offsets):
+                    all_entries.extend(entries)
+        
+        return all_entries
+    
     def get_services(self):
         """Pobiera WSZYSTKIE usługi (kanały) z TVHeadend"""
         try:
-            all_services = []
-            start = 0
-            limit = 500
-            
-            url = f"{self.base_url}/api/mpegts/service/grid"
-            
-            while True:
-                params = {'start': start, 'limit': limit}
-                response = requests.get(url, params=params, auth=self.auth, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                entries = data.get('entries', [])
-                total = data.get('total', 0)
-                
-                all_services.extend(entries)
-                
-                if len(all_services) >= total or len(entries) == 0:
-                    break
-                
-                start += limit
-            
-            return all_services
+            return self.get_grid('/api/mpegts/service/grid', self.service_fields)
         except Exception as e:
             raise Exception(f"Błąd pobierania usług: {str(e)}")
     
     def get_channels(self):
         """Pobiera wszystkie kanały z TVHeadend"""
         try:
-            url = f"{self.base_url}/api/channel/grid"
-            params = {'start': 0, 'limit': 999999}
-            response = requests.get(url, params=params, auth=self.auth, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('entries', [])
+            return self.get_grid('/api/channel/grid', self.channel_fields)
         except Exception as e:
             raise Exception(f"Błąd pobierania kanałów: {str(e)}")
     
@@ -74,9 +149,9 @@ class TVHeadendAPI:
         """Pobiera listę tagów z TVHeadend"""
         try:
             url = f"{self.base_url}/api/channeltag/grid"
-            response = requests.get(url, auth=self.auth, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             return data.get('entries', [])
         except Exception as e:
             raise Exception(f"Błąd pobierania tagów: {str(e)}")
@@ -89,31 +164,35 @@ class TVHeadendAPI:
             if index is not None:
                 conf['index'] = index
             
-            data = {'conf': json.dumps(conf)}
-            response = requests.post(url, data=data, auth=self.auth, timeout=10)
+            data = {'conf': json_dumps(conf)}
+            response = self.session.post(url, data=data, timeout=10)
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
         except Exception as e:
             raise Exception(f"Błąd tworzenia tagu: {str(e)}")
     
-    def update_channel(self, channel_uuid, tags=None, number=None, name=None):
-        """Aktualizuje kanał"""
+    @staticmethod
+    def channel_node(channel_uuid, tags=None, number=None, name=None):
+        """Buduje węzeł aktualizacji kanału dla update_channels"""
+        node = {'uuid': channel_uuid}
+        if tags is not None:
+            node['tags'] = tags
+        if number is not None:
+            node['number'] = number
+        if name is not None:
+            node['name'] = name
+        return node
+    
+    def update_channels(self, nodes):
+        """Aktualizuje wiele kanałów jednym zapytaniem (idnode/save przyjmuje listę węzłów)"""
         try:
-            url = f"{self.base_url}/api/channel/save"
-            updates = {'uuid': channel_uuid}
-            if tags is not None:
-                updates['tags'] = tags
-            if number is not None:
-                updates['number'] = number
-            if name is not None:
-                updates['name'] = name
-            
-            data = {'node': json.dumps(updates)}
-            response = requests.post(url, data=data, auth=self.auth, timeout=10)
+            url = f"{self.base_url}/api/idnode/save"
+            data = {'node': json_dumps(nodes)}
+            response = self.session.post(url, data=data, timeout=10)
             response.raise_for_status()
             return True
         except Exception as e:
-            raise Exception(f"Błąd aktualizacji kanału: {str(e)}")
+            raise Exception(f"Błąd aktualizacji kanałów: {str(e)}")
     
     def create_channel_from_service(self, service_uuid, name, tags=None, number=None):
         """Tworzy kanał z usługi"""
@@ -129,10 +208,10 @@ class TVHeadendAPI:
             if number:
                 conf['number'] = number
             
-            data = {'conf': json.dumps(conf)}
-            response = requests.post(url, data=data, auth=self.auth, timeout=10)
+            data = {'conf': json_dumps(conf)}
+            response = self.session.post(url, data=data, timeout=10)
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
         except Exception as e:
             raise Exception(f"Błąd tworzenia kanału: {str(e)}")
 
@@ -141,6 +220,7 @@ class BouquetParser:
     """Klasa do parsowania list kanałów ze stron WWW"""
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_channel_name(name):
         """
         Normalizuje nazwę kanału do klucza mapowania:
@@ -151,15 +231,21 @@ class BouquetParser:
         if not name:
             return ""
         
+        # Nazwa złożona już tylko z małych liter ASCII jest gotowym kluczem
+        if name.isascii() and name.isalpha() and name.islower():
+            return name
+        
         # Konwersja na małe litery
         normalized = name.lower()
         
-        # Usuń wszystko oprócz liter (a-z)
-        normalized = re.sub(r'[^a-z]', '', normalized)
+        # Usuń wszystko oprócz liter (a-z) - znaki spoza ASCII odpadają przy kodowaniu
+        normalized = normalized.encode('ascii', 'ignore')
+        normalized = normalized.translate(None, _NON_KEY_BYTES).decode('ascii')
         
         return normalized
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def clean_channel_name(name):
         """
         Czyści nazwę kanału do zapisania (usuwa parametry techniczne i gatunki)
@@ -170,31 +256,30 @@ class BouquetParser:
         cleaned = name
         
         # Lista słów kluczowych gatunków do usunięcia (czesto znajdują się w kolumnie Nazwa lub na jej końcu)
-        genres = r'\b(muzyczny|informacyjny|uniwersalny|filmowy|sportowy|religijny|dokumentalny|rozrywkowy|dla dzieci|telezakupowy|prawniczy|kulinarny|motoryzacyjny|erotyczny|turystyczny|lifestyle)\b'
-        cleaned = re.sub(genres, '', cleaned, flags=re.IGNORECASE)
+        cleaned = _RE_GENRES.sub('', cleaned)
 
         # Usuń parametry techniczne DVB/DB
-        cleaned = re.sub(r'\s*(dvb-[st]\d?(?:/\w+)?|db-s\d?/\w+)\s*', '', cleaned, flags=re.IGNORECASE)
+        cleaned = _RE_DVB_PARAMS.sub('', cleaned)
         
         # Usuń jakość HD/SD/UHD/4K
-        cleaned = re.sub(r'\s*\b(HD|SD|UHD|4K|UD)\b\s*', ' ', cleaned, flags=re.IGNORECASE)
+        cleaned = _RE_QUALITY_WORD.sub(' ', cleaned)
         
         # Usuń parametry satelitarne (częstotliwość, polaryzacja, symbol rate, FEC, modulacja)
-        cleaned = re.sub(r'\d{1,2}[.,]\d{3}', '', cleaned)  # częstotliwość
-        cleaned = re.sub(r'\b[VHLR]\b', '', cleaned)  # polaryzacja
-        cleaned = re.sub(r'\b\d{5}\b', '', cleaned)  # symbol rate
-        cleaned = re.sub(r'\d/\d', '', cleaned)  # FEC
-        cleaned = re.sub(r'\bs\d/\w+\b', '', cleaned, flags=re.IGNORECASE)  # modulacja
-        
-        # Usuń "D D" i pojedyncze "D"
-        cleaned = re.sub(r'\s+D\s+D\s*$', '', cleaned)
-        cleaned = re.sub(r'\s+D\s*$', '', cleaned)
+        # Częstotliwość, SR, FEC i modulacja sX/... wymagają cyfry - bez cyfr pomijamy te przejścia
+        if _RE_DIGIT.search(cleaned):
+            cleaned = _RE_FREQ.sub('', cleaned)  # częstotliwość
+            cleaned = _RE_POL.sub('', cleaned)  # polaryzacja
+            cleaned = _RE_SR.sub('', cleaned)  # symbol rate
+            cleaned = _RE_FEC.sub('', cleaned)  # FEC
+            cleaned = _RE_S_MOD.sub('', cleaned)  # modulacja
+        else:
+            cleaned = _RE_POL.sub('', cleaned)  # polaryzacja
         
-        # Usuń pojedyncze "-" lub "+" na końcu
-        cleaned = re.sub(r'\s*[-+]\s*$', '', cleaned)
+        # Usuń końcowe "D D" / "D" i pojedynczy "-" lub "+" przed nimi - jednym przejściem
+        cleaned = _RE_TAIL.sub('', cleaned, count=1)
         
         # Normalizuj białe znaki
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+        cleaned = _RE_WS.sub(' ', cleaned).strip()
         
         return cleaned
     
@@ -209,13 +294,47 @@ class BouquetParser:
         """
         return BouquetParser.normalize_channel_name(name)
     
+    # Pobrane strony: url -> (nagłówki warunkowe, treść) - ponowne pobranie listy kończy się zwykle na 304.
+    # Pamiętamy najwyżej page_cache_size stron, najstarsze są usuwane (lista to kilka-kilkanaście podstron)
+    page_cache_size = 32
+    _page_cache = {}
+    _page_cache_lock = threading.Lock()
+    
+    @staticmethod
+    def get_page(session, url):
+        """Pobiera stronę warunkowo (ETag / Last-Modified); przy 304 zwraca treść z pamięci"""
+        with BouquetParser._page_cache_lock:
+            cached = BouquetParser._page_cache.get(url)
+        headers = cached[0] if cached else {}
+        response = session.get(url, headers=headers, timeout=10)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        if validators:
+            with BouquetParser._page_cache_lock:
+                cache = BouquetParser._page_cache
+                cache.pop(url, None)  # odświeżona strona trafia na koniec kolejki
+                cache[url] = (validators, response.content)
+                while len(cache) > BouquetParser.page_cache_size:
+                    del cache[next(iter(cache))]
+        return response.content
+    
     @staticmethod
     def parse_satkurier(url):
         """Parsuje listę kanałów z satkurier.pl"""
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            session = requests.Session()
+            try:
+                content = BouquetParser.get_page(session, url)
+            finally:
+                session.close()
+            soup = BeautifulSoup(content, HTML_PARSER, parse_only=_TABLES_ONLY)
             
             bouquets = {}
             current_category = "Bez kategorii"
@@ -224,6 +343,9 @@ class BouquetParser:
             tables = soup.find_all('table')
             
             for table in tables:
+                if table.find_parent('table') is not None:
+                    # Tabela zagnieżdżona - jej wiersze przeszła już tabela zewnętrzna, w kolejności dokumentu
+                    continue
                 rows = table.find_all('tr')
                 
                 # Znajdź indeks kolumny "Nazwa" w nagłówku tabeli
@@ -268,7 +390,7 @@ class BouquetParser:
                             continue
                         
                         # Sprawdzenie czy to nie jest jakiś śmieciowy wiersz (np. same myślniki)
-                        if re.match(r'^[\s\-_]+$', full_text):
+                        if _RE_JUNK_ROW.match(full_text):
                             continue
 
                         channel_info = BouquetParser.parse_channel_info(full_text)
@@ -288,58 +410,64 @@ class BouquetParser:
     @staticmethod
     def parse_channel_info(text):
         """Parsuje informacje o kanale z tekstu"""
-        text = re.sub(r'^\d+\.?\s*', '', text)
+        text = _RE_LEADING_NUM.sub('', text)
         
-        if not text or len(text) < 2:
+        # Śmieciowe komórki (same cyfry / białe znaki) odpadają przed regexami
+        if not text or len(text) < 2 or text.isdigit() or text.isspace():
             return None
         
-        info = {
-            'name': '',
-            'full_text': text,
-            'quality': '',
-            'frequency': '',
-            'polarization': '',
-            'symbol_rate': '',
-            'fec': '',
-            'modulation': ''
-        }
-        
-        # Wykryj parametry techniczne (jeśli wciąż obecne w tekście)
-        freq_match = re.search(r'(\d{1,2}[.,]\d{3})', text)
-        if freq_match:
-            info['frequency'] = freq_match.group(1)
-        
-        pol_match = re.search(r'\b([VHLR])\b', text)
-        if pol_match:
-            info['polarization'] = pol_match.group(1)
-        
-        sr_match = re.search(r'\b(\d{5})\b', text)
-        if sr_match:
-            info['symbol_rate'] = sr_match.group(1)
-        
-        fec_match = re.search(r'(\d/\d)', text)
-        if fec_match:
-            info['fec'] = fec_match.group(1)
-        
-        mod_match = re.search(r'(DVB-[ST]\d?(?:/\w+)?|DB-S\d?/\w+)', text, flags=re.IGNORECASE)
-        if mod_match:
-            info['modulation'] = mod_match.group(1)
-        
-        quality_match = re.search(r'\b(HD|SD|UHD|4K|UD)\b', text, flags=re.IGNORECASE)
-        if quality_match:
-            info['quality'] = quality_match.group(1).upper()
+        # Parametry techniczne nie są nigdzie odczytywane - zostaje tylko nazwa i klucz
+        info = {'name': '', 'full_text': text}
         
         # Wyczyść nazwę kanału
         info['name'] = BouquetParser.clean_channel_name(text)
+        # Klucz mapowania liczony raz przy parsowaniu, ImportWorker go nie przelicza
+        info['mapping_key'] = BouquetParser.create_mapping_key(info['name'])
         
         return info
 
+class ServicesWorker(QThread):
+    """Wątek pobierający usługi z TVHeadend (połączenie nie blokuje okna)"""
+    
+    finished = pyqtSignal(object, str)  # lista usług (None przy błędzie), komunikat błędu
+    
+    def __init__(self, api):
+        super().__init__()
+        self.api = api
+    
+    def run(self):
+        try:
+            self.finished.emit(self.api.get_services(), "")
+        except Exception as e:
+            self.finished.emit(None, str(e))
+
+class ParseWorker(QThread):
+    """Wątek pobierający i parsujący listę kanałów (parsowanie nie blokuje okna)"""
+    
+    finished = pyqtSignal(object, str)  # bukiety (None przy błędzie), komunikat błędu
+    
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+    
+    def run(self):
+        try:
+            self.finished.emit(BouquetParser.parse_satkurier(self.url), "")
+        except Exception as e:
+            self.finished.emit(None, str(e))
+
 class ImportWorker(QThread):
     """Wątek do importu bouquetów"""
     
     progress = pyqtSignal(int, str)
     finished = pyqtSignal(bool, str)
     
+    # Liczba równoległych zapisów kanałów do TVHeadend
+    max_workers = 8
+    # Minimalny odstęp (s) między sygnałami postępu - komunikaty z przerwy idą razem
+    progress_interval = 0.25
+    update_batch_size = 100  # węzłów w jednym zapisie idnode/save
+    
     def __init__(self, api, bouquets, services, use_service_names=True, create_tags=True):
         super().__init__()
         self.api = api
@@ -347,7 +475,30 @@ class ImportWorker(QThread):
         self.services = services
         self.use_service_names = use_service_names  # True = użyj nazw z serwera, False = z listy zdalnej
         self.create_tags = create_tags
-        
+        self._pending_messages = []
+        self._progress_value = 0
+        self._last_emit = 0.0
+        
+    def report_progress(self, value, message):
+        """Buforuje komunikat i wysyła sygnał progress najwyżej raz na progress_interval"""
+        self._progress_value = value
+        self._pending_messages.append(message)
+        if time.monotonic() - self._last_emit >= self.progress_interval:
+            self.flush_progress()
+    
+    def flush_progress(self):
+        """Wysyła zbuforowane komunikaty postępu jednym sygnałem"""
+        if self._pending_messages:
+            self.progress.emit(self._progress_value, '\n'.join(self._pending_messages))
+            self._pending_messages = []
+        self._last_emit = time.monotonic()
+    
+    def wait_result(self, future):
+        """Zwraca wynik future; przed blokującym czekaniem wysyła zbuforowane komunikaty"""
+        if not future.done():
+            self.flush_progress()
+        return future.result()
+    
     def run(self):
         try:
             total_channels = sum(len(channels) for channels in self.bouquets.values())
@@ -356,153 +507,160 @@ class ImportWorker(QThread):
             created_channels = 0
             updated_channels = 0
             
-            self.progress.emit(0, "Pobieranie istniejących tagów...")
+            # Tagi i kanały serwera są od siebie niezależne - pobieramy je równolegle
+            prefetch = ThreadPoolExecutor(max_workers=2)
+            tags_future = prefetch.submit(self.api.get_tags)
+            channels_future = prefetch.submit(self.api.get_channels)
+            prefetch.shutdown(wait=False)
             
-            existing_tags = {tag['name']: tag['uuid'] for tag in self.api.get_tags()}
+            self.report_progress(0, "Pobieranie istniejących tagów...")
+            
+            existing_tags = {tag['name']: tag['uuid'] for tag in self.wait_result(tags_future)}
             
             # Twórz mapę usług: klucz_mapowania → service
-            self.progress.emit(5, "Tworzenie mapy usług...")
+            self.report_progress(5, "Tworzenie mapy usług...")
             services_map = {}
             for service in self.services:
                 name = service.get('svcname', '')
                 if name:
-                    mapping_key = BouquetParser.create_mapping_key(name)
-                    if mapping_key and mapping_key not in services_map:  # unikaj duplikatów
-                        services_map[mapping_key] = service
-            
-            self.progress.emit(10, f"Mapa usług: {len(services_map)} unikalnych kluczy")
-            
-            # Twórz mapę kanałów z listy zdalnej: klucz_mapowania → channel_info
-            self.progress.emit(12, "Tworzenie mapy kanałów ze zdalnej listy...")
-            remote_map = {}
-            for category, channels in self.bouquets.items():
-                for ch_info in channels:
-                    name = ch_info['name']
-                    mapping_key = BouquetParser.create_mapping_key(name)
-                    if mapping_key and mapping_key not in remote_map:
-                        remote_map[mapping_key] = ch_info
-            
-            self.progress.emit(14, f"Mapa zdalnych kanałów: {len(remote_map)} unikalnych kluczy")
-            
-            self.progress.emit(15, "Pobieranie istniejących kanałów...")
-            existing_channels = self.api.get_channels()
-            channels_by_service = {}
-            for ch in existing_channels:
-                services = ch.get('services', [])
-                if services:
-                    for svc_uuid in services:
-                        channels_by_service[svc_uuid] = ch
+                    # Klucz zapisany na usłudze - kolejne importy w tej sesji go nie przeliczają
+                    mapping_key = service.get('mapping_key')
+                    if mapping_key is None:
+                        mapping_key = service['mapping_key'] = BouquetParser.create_mapping_key(name)
+                    if mapping_key:
+                        services_map.setdefault(mapping_key, service)  # unikaj duplikatów
+            
+            self.report_progress(10, f"Mapa usług: {len(services_map)} unikalnych kluczy")
+            
+            self.report_progress(15, "Pobieranie istniejących kanałów...")
+            existing_channels = self.wait_result(channels_future)
+            channels_by_service = {
+                svc_uuid: ch
+                for ch in existing_channels
+                for svc_uuid in ch.get('services') or []
+            }
             
-            self.progress.emit(18, f"Znaleziono {len(existing_channels)} istniejących kanałów")
+            self.report_progress(18, f"Znaleziono {len(existing_channels)} istniejących kanałów")
             
             # Śledź przetworzone usługi
             processed_services = set()
             
             tag_index = 0
-            for category, channels in self.bouquets.items():
-                self.progress.emit(
-                    18 + int((processed / total_channels) * 72),
-                    f"Przetwarzam kategorię: {category}"
-                )
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for category, channels in self.bouquets.items():
+                    # Procent postępu liczony raz (arytmetyka całkowita) i używany we wszystkich komunikatach
+                    pct = 18 + processed * 72 // total_channels
+                    self.report_progress(
+                        pct,
+                        f"Przetwarzam kategorię: {category}"
+                    )
                 
-                tag_uuid = None
-                if self.create_tags:
-                    if category in existing_tags:
-                        tag_uuid = existing_tags[category]
-                    else:
-                        result = self.api.create_tag(category, f"Importowane z listy", tag_index)
-                        tag_uuid = result.get('uuid')
-                        existing_tags[category] = tag_uuid
-                        tag_index += 1
-                        self.progress.emit(
-                            18 + int((processed / total_channels) * 72),
-                            f"  ✓ Utworzono tag '{category}'"
-                        )
+                    tag_uuid = None
+                    if self.create_tags:
+                        if category in existing_tags:
+                            tag_uuid = existing_tags[category]
+                        else:
+                            self.flush_progress()
+                            result = self.api.create_tag(category, f"Importowane z listy", tag_index)
+                            tag_uuid = result.get('uuid')
+                            existing_tags[category] = tag_uuid
+                            tag_index += 1
+                            self.report_progress(
+                                pct,
+                                f"  ✓ Utworzono tag '{category}'"
+                            )
                 
-                for channel_info in channels:
-                    original_name = channel_info['name']
-                    channel_number = channel_info['number']
+                    # Wpisy (rodzaj, future lub numer paczki, komunikat) w kolejności listy - także pominięcia,
+                    # żeby log zachował kolejność kanałów
+                    pending = []
+                    batches = []  # futures paczek aktualizacji idnode/save
+                    updates = []
+                    for channel_info in channels:
+                        original_name = channel_info['name']
+                        channel_number = channel_info['number']
                     
-                    # Klucz mapowania
-                    mapping_key = BouquetParser.create_mapping_key(original_name)
+                        # Klucz mapowania
+                        mapping_key = channel_info['mapping_key']
                     
-                    if not mapping_key:
-                        self.progress.emit(
-                            18 + int((processed / total_channels) * 72),
-                            f"  ✗ Pominięto (brak liter): {original_name}"
-                        )
-                        processed += 1
-                        continue
-                    
-                    # Sprawdź czy istnieje dopasowanie w mapie usług
-                    if mapping_key in services_map:
-                        service = services_map[mapping_key]
-                        service_uuid = service['uuid']
-                        
-                        # Pomiń jeśli już przetworzone
-                        if service_uuid in processed_services:
-                            self.progress.emit(
-                                18 + int((processed / total_channels) * 72),
-                                f"  ⊗ Pominięto (duplikat): {original_name}"
-                            )
+                        if not mapping_key:
+                            pending.append(('log', None, f"  ✗ Pominięto (brak liter): {original_name}"))
                             processed += 1
                             continue
+                    
+                        # Sprawdź czy istnieje dopasowanie w mapie usług
+                        if mapping_key in services_map:
+                            service = services_map[mapping_key]
+                            service_uuid = service['uuid']
                         
-                        processed_services.add(service_uuid)
+                            # Pomiń jeśli już przetworzone
+                            if service_uuid in processed_services:
+                                pending.append(('log', None, f"  ⊗ Pominięto (duplikat): {original_name}"))
+                                processed += 1
+                                continue
                         
-                        # Wybierz nazwę do zapisu
-                        if self.use_service_names:
-                            # Użyj oczyszczonej nazwy z serwera TVHeadend
-                            final_name = BouquetParser.clean_channel_name(service.get('svcname', ''))
-                        else:
-                            # Użyj oczyszczonej nazwy z listy zdalnej
-                            final_name = BouquetParser.clean_channel_name(original_name)
+                            processed_services.add(service_uuid)
+                        
+                            # Wybierz nazwę do zapisu
+                            if self.use_service_names:
+                                # Użyj oczyszczonej nazwy z serwera TVHeadend
+                                final_name = BouquetParser.clean_channel_name(service.get('svcname', ''))
+                            else:
+                                # Użyj oczyszczonej nazwy z listy zdalnej
+                                final_name = BouquetParser.clean_channel_name(original_name)
                         
-                        service_original = service.get('svcname', '')
+                            service_original = service.get('svcname', '')
                         
-                        if service_uuid in channels_by_service:
-                            # Aktualizuj istniejący kanał
-                            existing_channel = channels_by_service[service_uuid]
-                            tags = existing_channel.get('tags', [])
-                            if tag_uuid and tag_uuid not in tags:
-                                tags.append(tag_uuid)
+                            if service_uuid in channels_by_service:
+                                # Aktualizuj istniejący kanał
+                                existing_channel = channels_by_service[service_uuid]
+                                tags = existing_channel.get('tags', [])
+                                if tag_uuid and tag_uuid not in tags:
+                                    tags.append(tag_uuid)
                             
-                            self.api.update_channel(
-                                existing_channel['uuid'],
-                                tags=tags,
-                                number=channel_number,
-                                name=final_name
-                            )
-                            updated_channels += 1
-                            self.progress.emit(
-                                18 + int((processed / total_channels) * 72),
-                                f"  ✓ Zaktualizowano: {final_name} [{mapping_key}] (serwer: {service_original})"
-                            )
-                        else:
-                            # Utwórz nowy kanał
-                            tags = [tag_uuid] if tag_uuid else []
-                            self.api.create_channel_from_service(
-                                service_uuid,
-                                final_name,
-                                tags=tags,
-                                number=channel_number
-                            )
-                            created_channels += 1
-                            self.progress.emit(
-                                18 + int((processed / total_channels) * 72),
-                                f"  ✓ Utworzono: {final_name} [{mapping_key}] (serwer: {service_original})"
-                            )
+                                updates.append(TVHeadendAPI.channel_node(
+                                    existing_channel['uuid'],
+                                    tags=tags,
+                                    number=channel_number,
+                                    name=final_name
+                                ))
+                                pending.append(('update', len(batches), f"  ✓ Zaktualizowano: {final_name} [{mapping_key}] (serwer: {service_original})"))
+                                if len(updates) >= self.update_batch_size:
+                                    batches.append(executor.submit(self.api.update_channels, updates))
+                                    updates = []
+                            else:
+                                # Utwórz nowy kanał
+                                tags = [tag_uuid] if tag_uuid else []
+                                future = executor.submit(
+                                    self.api.create_channel_from_service,
+                                    service_uuid,
+                                    final_name,
+                                    tags=tags,
+                                    number=channel_number
+                                )
+                                pending.append(('create', future, f"  ✓ Utworzono: {final_name} [{mapping_key}] (serwer: {service_original})"))
                         
-                        matched += 1
-                    else:
-                        self.progress.emit(
-                            18 + int((processed / total_channels) * 72),
-                            f"  ✗ Nie znaleziono: {original_name} [{mapping_key}]"
-                        )
+                            matched += 1
+                        else:
+                            pending.append(('log', None, f"  ✗ Nie znaleziono: {original_name} [{mapping_key}]"))
+                    
+                        processed += 1
                     
-                    processed += 1
+                    if updates:
+                        batches.append(executor.submit(self.api.update_channels, updates))
+                    
+                    pct = 18 + processed * 72 // total_channels
+                    # Zapisy kanałów z kategorii idą równolegle (aktualizacje paczkami), wyniki zbieramy w kolejności
+                    for kind, ref, message in pending:
+                        if kind == 'update':
+                            self.wait_result(batches[ref])
+                            updated_channels += 1
+                        elif kind == 'create':
+                            self.wait_result(ref)
+                            created_channels += 1
+                        self.report_progress(pct, message)
             
-            self.progress.emit(100, "Import zakończony!")
+            self.report_progress(100, "Import zakończony!")
+            self.flush_progress()
             
             summary = (
                 f"Import zakończony!\n\n"
@@ -515,15 +673,48 @@ class ImportWorker(QThread):
             self.finished.emit(True, summary)
             
         except Exception as e:
+            self.flush_progress()
             self.finished.emit(False, f"Błąd importu: {str(e)}")
 
 
+class ServicesModel(QAbstractTableModel):
+    """Model tabeli usług czytający wprost z listy słowników (bez QTableWidgetItem na komórkę)"""
+    
+    columns = ('svcname', 'svctype', 'uuid')
+    headers = ("Nazwa usługi", "Typ", "UUID")
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.services = []
+    
+    def set_services(self, services):
+        self.beginResetModel()
+        self.services = services
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.services)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return self.services[index.row()].get(self.columns[index.column()], '')
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.api = None
         self.services = []
         self.bouquets = {}
+        self.parse_worker = None
         self.init_ui()
         
     def init_ui(self):
@@ -595,6 +786,7 @@ class MainWindow(QMainWindow):
         
         self.preview_text = QTextEdit()
         self.preview_text.setReadOnly(True)
+        self.preview_text.setUndoRedoEnabled(False)  # podgląd tylko do odczytu - bez stosu cofania
         preview_layout.addWidget(self.preview_text)
         
         tabs.addTab(preview_tab, "Podgląd listy")
@@ -602,9 +794,9 @@ class MainWindow(QMainWindow):
         services_tab = QWidget()
         services_layout = QVBoxLayout(services_tab)
         
-        self.services_table = QTableWidget()
-        self.services_table.setColumnCount(3)
-        self.services_table.setHorizontalHeaderLabels(["Nazwa usługi", "Typ", "UUID"])
+        self.services_model = ServicesModel(self)
+        self.services_table = QTableView()
+        self.services_table.setModel(self.services_model)
         self.services_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         services_layout.addWidget(self.services_table)
         
@@ -646,64 +838,109 @@ class MainWindow(QMainWindow):
         layout.addWidget(import_group)
         
     def connect_tvh(self):
+        host = self.host_input.text()
+        port = self.port_input.text()
+        user = self.user_input.text()
+        password = self.pass_input.text()
+        
+        api = TVHeadendAPI(host, port, user, password)
+        
+        # Pobieranie usług w osobnym wątku - okno nie zamarza na czas zapytań.
+        # self.api podmieniamy dopiero po udanym połączeniu, a import w tym czasie jest zablokowany
+        self.connect_btn.setEnabled(False)
+        self.import_btn.setEnabled(False)
+        self.services_label.setText("Status: Łączenie...")
+        self.services_worker = ServicesWorker(api)
+        self.services_worker.finished.connect(self.services_loaded)
+        self.services_worker.start()
+    
+    def services_loaded(self, services, error):
+        self.connect_btn.setEnabled(True)
+        api = self.services_worker.api
         try:
-            host = self.host_input.text()
-            port = self.port_input.text()
-            user = self.user_input.text()
-            password = self.pass_input.text()
-            
-            self.api = TVHeadendAPI(host, port, user, password)
-            self.services = self.api.get_services()
+            if services is None:
+                api.close()
+                raise Exception(error)
+            # Poprzednia sesja nie jest już potrzebna - zamykamy jej połączenia
+            if self.api:
+                self.api.close()
+            self.api = api
+            self.services = services
             
             self.services_label.setText(f"Status: Połączony - znaleziono {len(self.services)} usług")
-            self.parse_btn.setEnabled(True)
+            # Nie w trakcie parsowania - przycisk włączy wtedy bouquet_parsed
+            self.parse_btn.setEnabled(not self.parse_running())
             
-            self.services_table.setRowCount(len(self.services))
-            for i, service in enumerate(self.services):
-                self.services_table.setItem(i, 0, QTableWidgetItem(service.get('svcname', '')))
-                self.services_table.setItem(i, 1, QTableWidgetItem(service.get('svctype', '')))
-                self.services_table.setItem(i, 2, QTableWidgetItem(service.get('uuid', '')))
+            # Model czyta wprost z listy usług - widok pyta tylko o widoczne wiersze
+            self.services_model.set_services(self.services)
             
             self.status_text.append(f"✓ Połączono z TVHeadend ({len(self.services)} usług)")
             
         except Exception as e:
             QMessageBox.critical(self, "Błąd połączenia", str(e))
             self.services_label.setText("Status: Błąd połączenia")
+        finally:
+            self.import_btn.setEnabled(bool(self.api and self.services and self.bouquets))
+    
+    def parse_running(self):
+        return self.parse_worker is not None and self.parse_worker.isRunning()
     
     def parse_bouquet(self):
+        # Drugi wątek nie może zastąpić działającego
+        if self.parse_running():
+            return
+        url = self.url_input.text()
+        if not url:
+            QMessageBox.warning(self, "Błąd", "Podaj URL listy kanałów")
+            return
+        
+        # Pobieranie i parsowanie listy w osobnym wątku - okno nie zamarza
+        self.parse_btn.setEnabled(False)
+        self.parse_worker = ParseWorker(url)
+        self.parse_worker.finished.connect(self.bouquet_parsed)
+        self.parse_worker.start()
+    
+    def bouquet_parsed(self, bouquets, error):
+        self.parse_btn.setEnabled(True)
         try:
-            url = self.url_input.text()
-            if not url:
-                QMessageBox.warning(self, "Błąd", "Podaj URL listy kanałów")
-                return
-            
-            self.bouquets = BouquetParser.parse_satkurier(url)
+            if bouquets is None:
+                raise Exception(error)
+            self.bouquets = bouquets
             
-            preview = ""
+            # Fragmenty podglądu zbieramy w liście i łączymy raz na końcu
+            preview = []
             total_channels = 0
             for category, channels in self.bouquets.items():
-                preview += f"\n{'='*80}\n{category} ({len(channels)} kanałów)\n{'='*80}\n"
-                for ch in channels[:10]:
-                    preview += f"{ch['number']:3d}. {ch['name']}\n"
+                count = len(channels)
+                preview.append(f"\n{'='*80}\n{category} ({count} kanałów)\n{'='*80}\n")
+                preview.extend(f"{ch['number']:3d}. {ch['name']}\n" for ch in islice(channels, 10))
                 
-                if len(channels) > 10:
-                    preview += f"... i {len(channels) - 10} więcej\n"
-                total_channels += len(channels)
+                if count > 10:
+                    preview.append(f"... i {count - 10} więcej\n")
+                total_channels += count
             
-            self.preview_text.setText(preview)
+            self.preview_text.setPlainText(''.join(preview))
             self.status_text.append(f"✓ Pobrano listę: {len(self.bouquets)} kategorii, {total_channels} kanałów")
             
-            if self.services:
+            # Nie w trakcie łączenia ani importu (wtedy przycisk "Połącz" jest wyłączony)
+            if self.services and self.connect_btn.isEnabled():
                 self.import_btn.setEnabled(True)
             
         except Exception as e:
             QMessageBox.critical(self, "Błąd parsowania", str(e))
     
+    def closeEvent(self, event):
+        # Zamykamy połączenia keep-alive do TVHeadend razem z oknem
+        if self.api:
+            self.api.close()
+        super().closeEvent(event)
+    
     def start_import(self):
         if not self.api or not self.bouquets:
             return
         
         self.import_btn.setEnabled(False)
+        self.connect_btn.setEnabled(False)  # ponowne połączenie zamknęłoby sesję używaną przez import
         use_service_names = self.use_server_names.isChecked()
         create_tags = self.create_tags_check.isChecked()
         
@@ -718,6 +955,7 @@ class MainWindow(QMainWindow):
     
     def import_finished(self, success, message):
         self.import_btn.setEnabled(True)
+        self.connect_btn.setEnabled(True)
         if success:
             QMessageBox.information(self, "Sukces", message)
         else: